@@ -1,219 +1,551 @@
-from groq import Groq
-from knowledge_base.kb_manager import KnowledgeBaseManager
-from mcp.math_client_search import MathSearchMCPClient
-from guardrails.input_guard import InputGuardrail
-from guardrails.output_guard import OutputGuardrail
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class MathRoutingAgent:
-    def __init__(self):
-        # Configure Groq API
-        groq_key = os.getenv("GROQ_API_KEY")
-        
-        if groq_key:
-            try:
-                self.llm = Groq(api_key=groq_key)
-                self.use_llm = True
-                print("✅ Groq API configured successfully")
-            except Exception as e:
-                print(f"⚠️ Groq API error: {e}")
-                self.use_llm = False
-                self.llm = None
-        else:
-            print("⚠️ Groq API not configured - using fallback mode")
-            self.use_llm = False
-            self.llm = None
-        
-        self.kb = KnowledgeBaseManager()
-        
-        # Initialize MCP Client
-        try:
-            self.mcp_search = MathSearchMCPClient()
-            print("✅ MCP Search Client initialized")
-        except Exception as e:
-            print(f"⚠️ MCP Client initialization error: {e}")
-            self.mcp_search = None
-        
-        self.input_guard = InputGuardrail()
-        self.output_guard = OutputGuardrail()
-        
-        self.system_prompt = """You are an expert mathematics professor. 
-Generate a clear, step-by-step solution that a student can easily understand.
-
-Format your response as:
-**Understanding the Problem:**
-[Brief explanation]
-
-**Step-by-Step Solution:**
-Step 1: [First step with explanation]
-Step 2: [Second step with explanation]
-...
-
-**Final Answer:**
-[Clear final answer]
-
-**Key Concepts:**
-[List important concepts used]
-"""
-    
-    def route_query(self, query: str) -> dict:
-        """Main routing logic with MCP integration"""
-        
-        # Step 1: Input Guardrail
-        is_valid, message = self.input_guard.validate(query)
-        if not is_valid:
-            return {
-                'success': False,
-                'source': 'guardrail',
-                'message': message
-            }
-        
-        # Step 2: Check Knowledge Base
-        kb_results = self.kb.search(query, top_k=1)
-        
-        if kb_results and kb_results[0]['score'] > 0.70:
-            result = kb_results[0]
-            solution = self._format_kb_solution(result)
-            
-            return {
-                'success': True,
-                'source': 'knowledge_base',
-                'solution': solution,
-                'confidence': round(result['score'], 2),
-                'routing_path': 'Input → Guardrails → Knowledge Base → Response'
-            }
-        
-        # Step 3: Web Search via MCP
-        if self.mcp_search:
-            try:
-                print(f"🔍 Routing through MCP for query: {query}")
-                search_results = self.mcp_search.search_math_solution(query, "basic")
-                
-                if search_results.get('found') and search_results.get('results'):
-                    context = self._extract_context(search_results['results'])
-                    
-                    if self.use_llm:
-                        solution = self._generate_solution_with_llm(query, context)
-                    else:
-                        solution = self._format_web_search_solution(query, search_results['results'])
-                    
-                    return {
-                        'success': True,
-                        'source': 'mcp_web_search',
-                        'solution': solution,
-                        'references': search_results['results'][:2],
-                        'routing_path': 'Input → Guardrails → KB (miss) → MCP Search → LLM → Response'
-                    }
-            except Exception as e:
-                print(f"⚠️ MCP search error: {e}")
-        
-        # Step 4: Fallback - Use LLM directly
-        if self.use_llm:
-            solution = self._generate_solution_with_llm(
-                query, 
-                "Use your mathematical knowledge to solve this problem step by step."
-            )
-            return {
-                'success': True,
-                'source': 'llm_direct',
-                'solution': solution,
-                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM Direct → Response'
-            }
-        else:
-            solution = self._generate_fallback_solution(query)
-            return {
-                'success': True,
-                'source': 'fallback',
-                'solution': solution,
-                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM (not configured) → Fallback Resources'
-            }
-    
-    # Keep all other methods the same...
-    def _format_kb_solution(self, result: dict) -> str:
-        """Format solution from knowledge base"""
-        solution = f"""**Understanding the Problem:**
-{result['question']}
-
-**Step-by-Step Solution:**
-"""
-        for i, step in enumerate(result['steps'], 1):
-            solution += f"Step {i}: {step}\n"
-        
-        solution += f"""
-**Final Answer:**
-{result['solution']}
-
-**Key Concepts:**
-- Topic: {result.get('topic', 'Mathematics').capitalize()}
-- Difficulty: {result.get('difficulty', 'Medium').capitalize()}
-
-**Source:** Knowledge Base (Confidence: {round(result['score'] * 100, 1)}%)
-"""
-        return solution
-    
-    def _format_web_search_solution(self, query: str, results: list) -> str:
-        """Format solution from MCP web search"""
-        solution = f"""**Understanding the Problem:**
-{query}
-
-**Information Retrieved via MCP (Model Context Protocol):**
-
-"""
-        for i, result in enumerate(results[:2], 1):
-            title = result.get('title', 'Unknown Source')
-            content = result.get('content', '')[:400]
-            url = result.get('url', '')
-            
-            solution += f"""**Source {i}: {title}**
-{content}...
-
-🔗 Read more: {url}
-
-"""
-        
-        solution += """
-**Note:** This solution was retrieved using Model Context Protocol (MCP) for web search integration.
-"""
-        return solution
-    
-    def _generate_fallback_solution(self, query: str) -> str:
-        """Generate fallback response"""
-        return f"""**Problem:** {query}
-
-**Status:** Not found in knowledge base. MCP search and LLM unavailable.
-
-**Recommended Resources:**
-1. **Khan Academy** - khanacademy.org
-2. **Symbolab** - symbolab.com
-3. **Wolfram Alpha** - wolframalpha.com
-"""
-    
-    def _generate_solution_with_llm(self, question: str, context: str) -> str:
-        """Generate solution using Groq"""
-        try:
-            chat_completion = self.llm.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Context from MCP Search:\n{context}\n\nQuestion: {question}\n\nProvide a detailed step-by-step solution."}
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0.3,
-                max_tokens=1024,
-            )
-            
-            return chat_completion.choices[0].message.content
-            
-        except Exception as e:
-            return f"Error generating solution: {str(e)}"
-    
-    def _extract_context(self, search_results: list) -> str:
-        """Extract context from MCP search results"""
-        context_parts = []
-        for result in search_results[:2]:
-            title = result.get('title', 'Unknown')
-            content = result.get('content', '')[:500]
-            context_parts.append(f"Source: {title}\n{content}")
-        return "\n\n".join(context_parts)
\ No newline at end of file
+from groq import Groq, AsyncGroq
+from knowledge_base.kb_manager import KnowledgeBaseManager
+from mcp.math_client_search import MathSearchMCPClient
+from guardrails.input_guard import InputGuardrail
+from guardrails.output_guard import OutputGuardrail
+from config import groq_key
+import asyncio
+import hashlib
+import numpy as np
+import time
+
+# Kept verbatim and always sent first so Groq's prompt-prefix cache can
+# reuse the prefill KV across requests - never interpolate into this
+SYSTEM_PROMPT = """You are an expert mathematics professor.
+Generate a clear, step-by-step solution that a student can easily understand.
+
+Format your response as:
+**Understanding the Problem:**
+[Brief explanation]
+
+**Step-by-Step Solution:**
+Step 1: [First step with explanation]
+Step 2: [Second step with explanation]
+...
+
+**Final Answer:**
+[Clear final answer]
+
+**Key Concepts:**
+[List important concepts used]
+"""
+
+# User-message skeleton with exactly two holes - frozen so the provider
+# prefix cache and the exact-match cache below both stay effective
+USER_TEMPLATE = "Context from MCP Search:\n{context}\n\nQuestion: {question}\n\nProvide a detailed step-by-step solution."
+
+# Prefix the LLM helpers put on failed generations; responses carrying
+# it are returned to the caller but never cached
+LLM_ERROR_PREFIX = "Error generating solution:"
+
+class MathRoutingAgent:
+    # Semantic cache settings
+    CACHE_SIMILARITY_THRESHOLD = 0.95
+    CACHE_MAX_ENTRIES = 512
+    CACHE_TTL_SECONDS = 3600
+
+    # How long the async path waits for MCP web search before falling
+    # back to the LLM directly
+    MCP_TIMEOUT_SECONDS = 2.5
+
+    # Hard cap on context characters (~250 tokens at ~4 chars/token) so
+    # prompt length stays predictable
+    CONTEXT_CHAR_BUDGET = 1000
+
+    # Exact-match LLM completion cache bound (FIFO eviction)
+    LLM_CACHE_MAX = 256
+
+    def __init__(self):
+        # Configure Groq API
+        api_key = groq_key()
+
+        if api_key:
+            try:
+                self.llm = Groq(api_key=api_key)
+                self.allm = AsyncGroq(api_key=api_key)
+                self.use_llm = True
+                print("✅ Groq API configured successfully")
+            except Exception as e:
+                print(f"⚠️ Groq API error: {e}")
+                self.use_llm = False
+                self.llm = None
+                self.allm = None
+        else:
+            print("⚠️ Groq API not configured - using fallback mode")
+            self.use_llm = False
+            self.llm = None
+            self.allm = None
+        
+        self.kb = KnowledgeBaseManager()
+        
+        # Initialize MCP Client
+        try:
+            self.mcp_search = MathSearchMCPClient()
+            print("✅ MCP Search Client initialized")
+        except Exception as e:
+            print(f"⚠️ MCP Client initialization error: {e}")
+            self.mcp_search = None
+        
+        self.input_guard = InputGuardrail()
+        self.output_guard = OutputGuardrail()
+
+        # Semantic response cache: embeddings matrix + parallel entry list
+        self._cache_embs = np.empty((0, 384), dtype=np.float32)
+        self._cache_entries = []
+
+        # Exact-match completion cache keyed on (context, question) bytes -
+        # complements the semantic cache, which keys on the embedding
+        self._llm_cache = {}
+
+        self.system_prompt = SYSTEM_PROMPT
+    
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed a query once, L2-normalized, for cache lookup and KB search"""
+        return self.kb.encode(query).astype(np.float32)
+
+    def _cache_lookup(self, query_embedding: np.ndarray):
+        """Return a cached result if a semantically similar query was answered recently"""
+        if len(self._cache_entries) == 0:
+            return None
+
+        sims = self._cache_embs @ query_embedding
+        best = int(np.argmax(sims))
+        entry = self._cache_entries[best]
+
+        if sims[best] >= self.CACHE_SIMILARITY_THRESHOLD:
+            if time.time() - entry['ts'] <= self.CACHE_TTL_SECONDS:
+                entry['ts'] = time.time()  # Refresh for LRU ordering
+                return entry['result']
+        return None
+
+    def _cache_store(self, query_embedding: np.ndarray, result: dict):
+        """Store a successful response keyed on the query embedding
+
+        Responses built from a failed LLM generation are skipped - a
+        transient Groq error must not be replayed to every similar query
+        for the full TTL.
+        """
+        solution = result.get('solution')
+        if isinstance(solution, str) and solution.startswith(LLM_ERROR_PREFIX):
+            return
+
+        if len(self._cache_entries) >= self.CACHE_MAX_ENTRIES:
+            # Evict least recently used entry
+            oldest = min(range(len(self._cache_entries)), key=lambda i: self._cache_entries[i]['ts'])
+            self._cache_embs = np.delete(self._cache_embs, oldest, axis=0)
+            self._cache_entries.pop(oldest)
+
+        self._cache_embs = np.vstack([self._cache_embs, query_embedding[np.newaxis, :]])
+        self._cache_entries.append({'result': result, 'ts': time.time()})
+
+    def route_query(self, query: str, no_cache: bool = False) -> dict:
+        """Main routing logic with MCP integration"""
+
+        # Step 1: Input Guardrail
+        is_valid, message = self.input_guard.validate(query)
+        if not is_valid:
+            return {
+                'success': False,
+                'source': 'guardrail',
+                'message': message
+            }
+
+        # Step 2: Semantic cache - skip the whole pipeline on a near-duplicate query
+        query_embedding = self._embed(query)
+
+        if not no_cache:
+            cached = self._cache_lookup(query_embedding)
+            if cached is not None:
+                print(f"⚡ Semantic cache hit for query: {query}")
+                return cached
+
+        # Step 3: Check Knowledge Base (reuse the embedding computed for the cache)
+        kb_results = self.kb.search(query, top_k=1, query_embedding=query_embedding)
+
+        if kb_results and kb_results[0]['score'] > 0.70:
+            result = kb_results[0]
+            solution = self._format_kb_solution(result)
+
+            response = {
+                'success': True,
+                'source': 'knowledge_base',
+                'solution': solution,
+                'confidence': round(result['score'], 2),
+                'routing_path': 'Input → Guardrails → Knowledge Base → Response'
+            }
+            self._cache_store(query_embedding, response)
+            return response
+        
+        # Step 4: Web Search via MCP
+        if self.mcp_search:
+            try:
+                print(f"🔍 Routing through MCP for query: {query}")
+                search_results = self.mcp_search.search_math_solution(query, "basic")
+
+                if search_results.get('found') and search_results.get('results'):
+                    context = self._extract_context(search_results['results'])
+
+                    if self.use_llm:
+                        solution = self._generate_solution_with_llm(query, context)
+                    else:
+                        solution = self._format_web_search_solution(query, search_results['results'])
+
+                    response = {
+                        'success': True,
+                        'source': 'mcp_web_search',
+                        'solution': solution,
+                        'references': search_results['results'][:2],
+                        'routing_path': 'Input → Guardrails → KB (miss) → MCP Search → LLM → Response'
+                    }
+                    self._cache_store(query_embedding, response)
+                    return response
+            except Exception as e:
+                print(f"⚠️ MCP search error: {e}")
+
+        # Step 5: Fallback - Use LLM directly
+        if self.use_llm:
+            solution = self._generate_solution_with_llm(
+                query,
+                "Use your mathematical knowledge to solve this problem step by step."
+            )
+            response = {
+                'success': True,
+                'source': 'llm_direct',
+                'solution': solution,
+                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM Direct → Response'
+            }
+            self._cache_store(query_embedding, response)
+            return response
+        else:
+            solution = self._generate_fallback_solution(query)
+            return {
+                'success': True,
+                'source': 'fallback',
+                'solution': solution,
+                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM (not configured) → Fallback Resources'
+            }
+    
+    async def aroute_query(self, query: str, no_cache: bool = False) -> dict:
+        """Async routing logic - same pipeline as route_query, but blocking
+        work runs in threads and MCP search is raced against a timeout so
+        the event loop is never held up by the full serial chain."""
+
+        # Step 1: Input Guardrail
+        is_valid, message = self.input_guard.validate(query)
+        if not is_valid:
+            return {
+                'success': False,
+                'source': 'guardrail',
+                'message': message
+            }
+
+        # Step 2: Semantic cache
+        query_embedding = await asyncio.to_thread(self._embed, query)
+
+        if not no_cache:
+            cached = self._cache_lookup(query_embedding)
+            if cached is not None:
+                print(f"⚡ Semantic cache hit for query: {query}")
+                return cached
+
+        # Step 3: Check Knowledge Base
+        kb_results = await asyncio.to_thread(
+            self.kb.search, query, 1, query_embedding
+        )
+
+        if kb_results and kb_results[0]['score'] > 0.70:
+            result = kb_results[0]
+            solution = self._format_kb_solution(result)
+
+            response = {
+                'success': True,
+                'source': 'knowledge_base',
+                'solution': solution,
+                'confidence': round(result['score'], 2),
+                'routing_path': 'Input → Guardrails → Knowledge Base → Response'
+            }
+            self._cache_store(query_embedding, response)
+            return response
+
+        # Step 4: Web Search via MCP, bounded by a timeout
+        if self.mcp_search:
+            search_results = await self._asearch_mcp(query)
+
+            if search_results and search_results.get('found') and search_results.get('results'):
+                context = self._extract_context(search_results['results'])
+
+                if self.use_llm:
+                    solution = await self._agenerate_solution_with_llm(query, context)
+                else:
+                    solution = self._format_web_search_solution(query, search_results['results'])
+
+                response = {
+                    'success': True,
+                    'source': 'mcp_web_search',
+                    'solution': solution,
+                    'references': search_results['results'][:2],
+                    'routing_path': 'Input → Guardrails → KB (miss) → MCP Search → LLM → Response'
+                }
+                self._cache_store(query_embedding, response)
+                return response
+
+        # Step 5: Fallback - Use LLM directly
+        if self.use_llm:
+            solution = await self._agenerate_solution_with_llm(
+                query,
+                "Use your mathematical knowledge to solve this problem step by step."
+            )
+            response = {
+                'success': True,
+                'source': 'llm_direct',
+                'solution': solution,
+                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM Direct → Response'
+            }
+            self._cache_store(query_embedding, response)
+            return response
+        else:
+            solution = self._generate_fallback_solution(query)
+            return {
+                'success': True,
+                'source': 'fallback',
+                'solution': solution,
+                'routing_path': 'Input → Guardrails → KB (miss) → MCP (unavailable) → LLM (not configured) → Fallback Resources'
+            }
+
+    async def _asearch_mcp(self, query: str):
+        """Run MCP web search in a worker thread, bounded by a timeout"""
+        print(f"🔍 Routing through MCP for query: {query}")
+        mcp_task = asyncio.create_task(
+            self.mcp_search.asearch_math_solution(query, "basic")
+        )
+        done, _ = await asyncio.wait({mcp_task}, timeout=self.MCP_TIMEOUT_SECONDS)
+
+        if mcp_task in done:
+            try:
+                return mcp_task.result()
+            except Exception as e:
+                print(f"⚠️ MCP search error: {e}")
+        else:
+            mcp_task.cancel()
+            print("⚠️ MCP search timed out - falling back to LLM")
+        return None
+
+    async def astream_query(self, query: str):
+        """Stream a solution as it is generated.
+
+        Cached and KB responses are already complete and are yielded
+        whole; LLM-backed paths forward Groq tokens as they arrive so the
+        user sees output at first-token latency."""
+
+        # Step 1: Input Guardrail
+        is_valid, message = self.input_guard.validate(query)
+        if not is_valid:
+            yield message
+            return
+
+        # Step 2: Semantic cache
+        query_embedding = await asyncio.to_thread(self._embed, query)
+        cached = self._cache_lookup(query_embedding)
+        if cached is not None:
+            print(f"⚡ Semantic cache hit for query: {query}")
+            yield cached.get('solution') or cached.get('message', '')
+            return
+
+        # Step 3: Check Knowledge Base
+        kb_results = await asyncio.to_thread(
+            self.kb.search, query, 1, query_embedding
+        )
+
+        if kb_results and kb_results[0]['score'] > 0.70:
+            result = kb_results[0]
+            solution = self._format_kb_solution(result)
+            self._cache_store(query_embedding, {
+                'success': True,
+                'source': 'knowledge_base',
+                'solution': solution,
+                'confidence': round(result['score'], 2),
+                'routing_path': 'Input → Guardrails → Knowledge Base → Response'
+            })
+            yield solution
+            return
+
+        # Step 4: Web Search via MCP for context
+        context = "Use your mathematical knowledge to solve this problem step by step."
+        source = 'llm_direct'
+        search_results = None
+
+        if self.mcp_search:
+            search_results = await self._asearch_mcp(query)
+            if search_results and search_results.get('found') and search_results.get('results'):
+                context = self._extract_context(search_results['results'])
+                source = 'mcp_web_search'
+
+        if not self.use_llm:
+            if source == 'mcp_web_search':
+                yield self._format_web_search_solution(query, search_results['results'])
+            else:
+                yield self._generate_fallback_solution(query)
+            return
+
+        # Step 5: Stream LLM tokens, then cache the assembled solution
+        parts = []
+        async for token in self._astream_solution_with_llm(query, context):
+            parts.append(token)
+            yield token
+
+        self._cache_store(query_embedding, {
+            'success': True,
+            'source': source,
+            'solution': ''.join(parts),
+            'routing_path': f'Input → Guardrails → KB (miss) → {source} (streamed) → Response'
+        })
+
+    # Keep all other methods the same...
+    def _format_kb_solution(self, result: dict) -> str:
+        """Format solution from knowledge base"""
+        # Built as a list and joined once - no quadratic += in the loop
+        parts = [f"""**Understanding the Problem:**
+{result['question']}
+
+**Step-by-Step Solution:**
+"""]
+        parts.extend(f"Step {i}: {step}\n" for i, step in enumerate(result['steps'], 1))
+
+        parts.append(f"""
+**Final Answer:**
+{result['solution']}
+
+**Key Concepts:**
+- Topic: {result.get('topic', 'Mathematics').capitalize()}
+- Difficulty: {result.get('difficulty', 'Medium').capitalize()}
+
+**Source:** Knowledge Base (Confidence: {round(result['score'] * 100, 1)}%)
+""")
+        return "".join(parts)
+
+    def _format_web_search_solution(self, query: str, results: list) -> str:
+        """Format solution from MCP web search"""
+        parts = [f"""**Understanding the Problem:**
+{query}
+
+**Information Retrieved via MCP (Model Context Protocol):**
+
+"""]
+        for i, result in enumerate(results[:2], 1):
+            title = result.get('title', 'Unknown Source')
+            content = result.get('content', '')[:400]
+            url = result.get('url', '')
+
+            parts.append(f"""**Source {i}: {title}**
+{content}...
+
+🔗 Read more: {url}
+
+""")
+
+        parts.append("""
+**Note:** This solution was retrieved using Model Context Protocol (MCP) for web search integration.
+""")
+        return "".join(parts)
+    
+    def _generate_fallback_solution(self, query: str) -> str:
+        """Generate fallback response"""
+        return f"""**Problem:** {query}
+
+**Status:** Not found in knowledge base. MCP search and LLM unavailable.
+
+**Recommended Resources:**
+1. **Khan Academy** - khanacademy.org
+2. **Symbolab** - symbolab.com
+3. **Wolfram Alpha** - wolframalpha.com
+"""
+    
+    def _generate_solution_with_llm(self, question: str, context: str) -> str:
+        """Generate solution using Groq"""
+        key = self._llm_cache_key(question, context)
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            chat_completion = self.llm.chat.completions.create(
+                messages=self._build_messages(question, context),
+                model="llama-3.1-8b-instant",
+                temperature=0.3,
+                max_tokens=1024,
+            )
+
+            solution = chat_completion.choices[0].message.content
+            self._llm_cache_put(key, solution)
+            return solution
+
+        except Exception as e:
+            return f"{LLM_ERROR_PREFIX} {str(e)}"
+
+    async def _agenerate_solution_with_llm(self, question: str, context: str) -> str:
+        """Generate solution using the async Groq client"""
+        key = self._llm_cache_key(question, context)
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            chat_completion = await self.allm.chat.completions.create(
+                messages=self._build_messages(question, context),
+                model="llama-3.1-8b-instant",
+                temperature=0.3,
+                max_tokens=1024,
+            )
+
+            solution = chat_completion.choices[0].message.content
+            self._llm_cache_put(key, solution)
+            return solution
+
+        except Exception as e:
+            return f"{LLM_ERROR_PREFIX} {str(e)}"
+
+    async def _astream_solution_with_llm(self, question: str, context: str):
+        """Stream solution tokens from Groq as they are generated"""
+        try:
+            stream = await self.allm.chat.completions.create(
+                messages=self._build_messages(question, context),
+                model="llama-3.1-8b-instant",
+                temperature=0.3,
+                max_tokens=1024,
+                stream=True,
+            )
+
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+        except Exception as e:
+            yield f"{LLM_ERROR_PREFIX} {str(e)}"
+
+    def _build_messages(self, question: str, context: str) -> list:
+        """Build chat messages with a stable literal prefix for prompt caching"""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": USER_TEMPLATE.format(context=context, question=question)}
+        ]
+
+    @staticmethod
+    def _llm_cache_key(question: str, context: str) -> bytes:
+        return hashlib.blake2b(
+            f"{context}|{question}".encode(), digest_size=16
+        ).digest()
+
+    def _llm_cache_put(self, key: bytes, solution: str):
+        if len(self._llm_cache) >= self.LLM_CACHE_MAX:
+            self._llm_cache.pop(next(iter(self._llm_cache)))
+        self._llm_cache[key] = solution
+
+    def _extract_context(self, search_results: list) -> str:
+        """Extract context from MCP search results"""
+        context_parts = []
+        for result in search_results[:2]:
+            title = result.get('title', 'Unknown')
+            content = result.get('content', '')[:500]
+            context_parts.append(f"Source: {title}\n{content}")
+        return "\n\n".join(context_parts)[:self.CONTEXT_CHAR_BUDGET]
\ No newline at end of file
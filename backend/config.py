@@ -0,0 +1,17 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Parse .env exactly once per process - modules import the cached
+# accessors below instead of calling load_dotenv()/os.getenv themselves
+load_dotenv()
+
+@lru_cache(maxsize=1)
+def groq_key():
+    """Groq API key (None when not configured)"""
+    return os.getenv("GROQ_API_KEY")
+
+@lru_cache(maxsize=1)
+def tavily_key():
+    """Tavily API key (None when not configured)"""
+    return os.getenv("TAVILY_API_KEY")
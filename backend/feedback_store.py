@@ -0,0 +1,79 @@
+import time
+import aiosqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    comments TEXT,
+    ts REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS feedback_stats (
+    rating INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS feedback_stats_after_insert
+AFTER INSERT ON feedback
+BEGIN
+    INSERT INTO feedback_stats(rating, count) VALUES (NEW.rating, 1)
+    ON CONFLICT(rating) DO UPDATE SET count = count + 1;
+END;
+"""
+
+class FeedbackStore:
+    """Append-only SQLite feedback store with trigger-maintained stats
+
+    The feedback_stats table is updated by an AFTER INSERT trigger, so
+    /api/feedback/stats reads at most five rows regardless of how much
+    feedback has accumulated. WAL mode keeps it safe across uvicorn
+    workers, and the data survives restarts.
+    """
+
+    def __init__(self, db_path: str = "feedback.db"):
+        self.db_path = db_path
+        self._db = None
+
+    async def open(self):
+        self._db = await aiosqlite.connect(self.db_path, isolation_level=None)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.executescript(_SCHEMA)
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def add(self, question: str, solution: str, rating: int, comments: str = None) -> int:
+        """Insert one feedback row; returns the total feedback count"""
+        await self._db.execute(
+            "INSERT INTO feedback (question, solution, rating, comments, ts) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (question, solution, rating, comments, time.time())
+        )
+        async with self._db.execute("SELECT SUM(count) FROM feedback_stats") as cursor:
+            (total,) = await cursor.fetchone()
+        return total or 0
+
+    async def stats(self) -> dict:
+        """Aggregate stats from the materialized counters (O(1) in rows)"""
+        counts = {rating: 0 for rating in range(1, 6)}
+        async with self._db.execute("SELECT rating, count FROM feedback_stats") as cursor:
+            async for rating, count in cursor:
+                counts[rating] = count
+
+        total = sum(counts.values())
+        if total == 0:
+            return {"average_rating": 0, "total_feedback": 0}
+
+        average = sum(rating * count for rating, count in counts.items()) / total
+        return {
+            "average_rating": round(average, 2),
+            "total_feedback": total,
+            "feedback_breakdown": {
+                f"{rating}_star": counts[rating] for rating in range(5, 0, -1)
+            }
+        }
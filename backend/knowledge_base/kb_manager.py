@@ -1,10 +1,20 @@
 import chromadb
 from sentence_transformers import SentenceTransformer
+import hashlib
 import json
+import numpy as np
+import threading
 from typing import List, Dict
 import os
 
 class KnowledgeBaseManager:
+    # Exact-match cap for the encode cache (FIFO eviction)
+    ENCODE_CACHE_MAX = 2048
+
+    # Above this many vectors, brute-force scanning loses to HNSW and
+    # searches stay on ChromaDB
+    BRUTE_FORCE_MAX = 10000
+
     def __init__(self, data_path: str = "backend/knowledge_base/math_dataset.json"):
         # NEW ChromaDB API - use PersistentClient
         self.client = chromadb.PersistentClient(path="./chroma_db")
@@ -14,14 +24,78 @@ class KnowledgeBaseManager:
             metadata={"hnsw:space": "cosine"}
         )
         
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Deferred to first use - loading the ~90 MB model costs seconds
+        # of startup and is wasted if every request hits a cache
+        self._model = None
+        self._model_name = 'all-MiniLM-L6-v2'
         self.data_path = data_path
-        
+
+        # Exact-match embedding cache - catches true duplicate queries
+        # before any transformer forward pass
+        self._encode_cache: Dict[str, object] = {}
+        self._encode_lock = threading.Lock()
+
+        # In-memory int8 index built from the persisted embeddings
+        self._emb_int8 = None
+        self._emb_scales = None
+        self._entries = []
+
+    @property
+    def model(self):
+        """SentenceTransformer, constructed lazily on first encode"""
+        if self._model is None:
+            print(f"⏳ Loading SentenceTransformer '{self._model_name}'...")
+            self._model = SentenceTransformer(self._model_name)
+        return self._model
+
+    def encode(self, text: str):
+        """Encode a single text with an exact-match cache in front of the model"""
+        with self._encode_lock:
+            cached = self._encode_cache.get(text)
+        if cached is not None:
+            return cached
+
+        embedding = self.model.encode(
+            [text], normalize_embeddings=True, convert_to_numpy=True
+        )[0]
+
+        with self._encode_lock:
+            if len(self._encode_cache) >= self.ENCODE_CACHE_MAX:
+                # Simple FIFO eviction - drop the oldest inserted entry
+                self._encode_cache.pop(next(iter(self._encode_cache)))
+            self._encode_cache[text] = embedding
+        return embedding
+
+    def encode_many(self, texts: List[str]):
+        """Encode a batch of texts in one forward pass, reusing cached entries"""
+        with self._encode_lock:
+            embeddings = [self._encode_cache.get(t) for t in texts]
+
+        missing = [t for t, e in zip(texts, embeddings) if e is None]
+        if missing:
+            computed = self.model.encode(
+                missing, batch_size=32, normalize_embeddings=True, convert_to_numpy=True
+            )
+            computed_map = dict(zip(missing, computed))
+            with self._encode_lock:
+                for text, embedding in computed_map.items():
+                    if len(self._encode_cache) >= self.ENCODE_CACHE_MAX:
+                        self._encode_cache.pop(next(iter(self._encode_cache)))
+                    self._encode_cache[text] = embedding
+            embeddings = [computed_map.get(t, e) if e is None else e
+                          for t, e in zip(texts, embeddings)]
+        return embeddings
+
     def load_and_index(self):
         """Load math dataset and create embeddings"""
+        # Precomputed embeddings (scripts/build_kb.py) beat re-encoding
+        if self._load_precomputed():
+            return
+
         # Check if already indexed
         if self.collection.count() > 0:
             print(f"✅ Knowledge base already loaded with {self.collection.count()} problems")
+            self._build_memory_index()
             return
         
         # Check if file exists
@@ -65,36 +139,158 @@ class KnowledgeBaseManager:
         )
         
         print(f"✅ Indexed {len(data)} math problems")
-    
-    def search(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Search for similar questions"""
+        self._build_memory_index()
+
+    def _build_memory_index(self):
+        """Quantize the persisted embeddings into an in-memory int8 matrix
+
+        ChromaDB stays the source of truth on disk; searches run against
+        an int8 copy (symmetric per-vector quantization) so a lookup is a
+        single integer matrix-vector product instead of an HNSW traversal.
+        """
+        count = self.collection.count()
+        if count > self.BRUTE_FORCE_MAX:
+            print(f"ℹ️ KB has {count} entries - keeping searches on ChromaDB HNSW")
+            return
+
         try:
-            query_embedding = self.model.encode([query]).tolist()
-            
+            stored = self.collection.get(include=['embeddings', 'documents', 'metadatas'])
+            embeddings = stored.get('embeddings')
+            if embeddings is None or len(embeddings) == 0:
+                return
+
+            entries = []
+            for document, metadata in zip(stored['documents'], stored['metadatas']):
+                steps_str = metadata.get('steps', '')
+                entries.append({
+                    'question': document,
+                    'solution': metadata.get('solution', ''),
+                    'steps': steps_str.split(' | ') if steps_str else [],
+                    'topic': metadata.get('topic', ''),
+                    'difficulty': metadata.get('difficulty', '')
+                })
+
+            self._set_memory_index(np.asarray(embeddings, dtype=np.float32), entries)
+        except Exception as e:
+            print(f"⚠️ Could not build in-memory index: {e}")
+            self._emb_int8 = None
+
+    def _set_memory_index(self, matrix, entries: List[Dict]):
+        """Quantize a float32 embedding matrix into the int8 search index"""
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        # scales are dequantization multipliers: v ≈ v_int8 * scale
+        self._emb_scales = (np.abs(matrix).max(axis=1) / 127.0).astype(np.float32)
+        self._emb_int8 = np.clip(
+            np.round(matrix / self._emb_scales[:, np.newaxis]), -127, 127
+        ).astype(np.int8)
+        self._entries = entries
+
+        print(f"✅ In-memory int8 index built ({len(self._entries)} vectors)")
+
+    def _load_precomputed(self) -> bool:
+        """mmap embeddings written by scripts/build_kb.py, if present and current"""
+        kb_dir = os.path.dirname(self.data_path)
+        emb_path = os.path.join(kb_dir, 'kb_emb.npy')
+        meta_path = os.path.join(kb_dir, 'kb_meta.json')
+
+        if not (os.path.exists(emb_path) and os.path.exists(meta_path)):
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            # Invalidate when the dataset has changed since the build
+            with open(self.data_path, 'rb') as f:
+                dataset_sha256 = hashlib.sha256(f.read()).hexdigest()
+            if meta.get('dataset_sha256') != dataset_sha256:
+                print("⚠️ Precomputed embeddings are stale - re-encoding")
+                return False
+
+            matrix = np.load(emb_path, mmap_mode='r')
+            self._set_memory_index(np.asarray(matrix, dtype=np.float32), meta['entries'])
+            print(f"✅ Loaded precomputed embeddings from {emb_path}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load precomputed embeddings: {e}")
+            return False
+
+    def _search_memory(self, query_embedding, top_k: int) -> List[Dict]:
+        """Brute-force int8 dot-product search over the in-memory index"""
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q /= np.linalg.norm(q)
+
+        q_scale = np.float32(np.abs(q).max() / 127.0)
+        q_int8 = np.clip(np.round(q / q_scale), -127, 127).astype(np.int8)
+
+        # int8 @ int8 accumulated to int32, then dequantized to cosine scores
+        scores = (self._emb_int8.astype(np.int32) @ q_int8.astype(np.int32)).astype(np.float32)
+        scores *= self._emb_scales * q_scale
+
+        top_k = min(top_k, len(scores))
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-scores[idx])]
+
+        return [dict(self._entries[i], score=float(scores[i])) for i in idx]
+
+    def count(self) -> int:
+        """Size of whichever index is actually serving searches
+
+        With precomputed embeddings the in-memory index is populated but
+        ChromaDB may be empty, so prefer the entry list.
+        """
+        if self._entries:
+            return len(self._entries)
+        return self.collection.count()
+
+    def search(self, query: str = None, top_k: int = 3, query_embedding=None) -> List[Dict]:
+        """Search for similar questions
+
+        Accepts either the raw query string or a precomputed embedding,
+        so callers that already embedded the query (e.g. for the semantic
+        cache) don't pay for a second encoder forward pass.
+        """
+        try:
+            if query_embedding is None:
+                query_embedding = self.encode(query)
+
+            # Prefer the in-memory int8 index; ChromaDB is the fallback
+            if self._emb_int8 is not None:
+                return self._search_memory(query_embedding, top_k)
+
+            # ChromaDB expects plain lists, not numpy arrays
+            if hasattr(query_embedding, 'tolist'):
+                query_embedding = query_embedding.tolist()
+
             results = self.collection.query(
-                query_embeddings=query_embedding,
+                query_embeddings=[query_embedding],
                 n_results=top_k
             )
             
             if not results['metadatas'][0]:
                 return []
-            
+
+            # Bind the parallel lists once and convert all distances to
+            # similarities in a single vector op
+            documents = results['documents'][0]
+            metadatas = results['metadatas'][0]
+            similarities = 1.0 - np.asarray(results['distances'][0], dtype=np.float32)
+
             # Convert steps string back to list
             formatted_results = []
-            for i in range(len(results['documents'][0])):
-                metadata = results['metadatas'][0][i]
+            for document, metadata, score in zip(documents, metadatas, similarities.tolist()):
                 steps_str = metadata.get('steps', '')
-                steps_list = steps_str.split(' | ') if steps_str else []
-                
+
                 formatted_results.append({
-                    'question': results['documents'][0][i],
+                    'question': document,
                     'solution': metadata.get('solution', ''),
-                    'steps': steps_list,
+                    'steps': steps_str.split(' | ') if steps_str else [],
                     'topic': metadata.get('topic', ''),
                     'difficulty': metadata.get('difficulty', ''),
-                    'score': 1 - results['distances'][0][i]  # Convert to similarity
+                    'score': score
                 })
-            
+
             return formatted_results
         except Exception as e:
             print(f"Search error: {e}")
@@ -1,24 +1,31 @@
+import os
+
+# Pin BLAS/tokenizer thread pools before torch or tokenizers are
+# (transitively) imported - the 384-dim encodes here are too small to
+# parallelize and oversubscription just burns time in context switches
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from typing import Optional
 import uvicorn
-import os
-from dotenv import load_dotenv
+from config import groq_key, tavily_key
 from agents.math_agent import MathRoutingAgent
+from feedback_store import FeedbackStore
 from knowledge_base.kb_manager import KnowledgeBaseManager
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Print for debugging (remove in production)
-print(f"🔍 Debug - GROQ_API_KEY exists: {bool(os.getenv('GROQ_API_KEY'))}")
-print(f"🔍 Debug - TAVILY_API_KEY exists: {bool(os.getenv('TAVILY_API_KEY'))}")
+print(f"🔍 Debug - GROQ_API_KEY exists: {bool(groq_key())}")
+print(f"🔍 Debug - TAVILY_API_KEY exists: {bool(tavily_key())}")
 
 
-# Store feedback
-feedback_store = []
+# Store feedback (SQLite-backed, opened during startup)
+feedback_store = FeedbackStore()
 
 # Initialize managers
 kb_manager = KnowledgeBaseManager()
@@ -30,16 +37,25 @@ async def lifespan(app: FastAPI):
     # Startup
     global math_agent
     print("🚀 Starting Math Agent API...")
+    try:
+        import torch
+        torch.set_num_threads(1)
+        torch.set_num_interop_threads(1)
+    except Exception as e:
+        print(f"⚠️ Could not pin torch threads: {e}")
     kb_manager.load_and_index()
+    await feedback_store.open()
     math_agent = MathRoutingAgent()
     print("✅ Math Agent API Ready!")
     yield
     # Shutdown
     print("👋 Shutting down Math Agent API...")
+    await feedback_store.close()
 
 app = FastAPI(
     title="Math Routing Agent API",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -64,39 +80,42 @@ class FeedbackRequest(BaseModel):
 async def solve_math_problem(request: QueryRequest):
     """Main endpoint to solve math problems"""
     try:
-        result = math_agent.route_query(request.question)
+        result = await math_agent.aroute_query(request.question)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/solve/stream")
+async def solve_math_problem_stream(request: QueryRequest):
+    """Stream the solution as Server-Sent Events while it is generated"""
+    async def event_stream():
+        try:
+            async for chunk in math_agent.astream_query(request.question):
+                for line in chunk.split('\n'):
+                    yield f"data: {line}\n"
+                yield "\n"
+            yield "event: done\ndata: \n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {e}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/api/feedback")
 async def submit_feedback(feedback: FeedbackRequest):
     """Human-in-the-loop feedback"""
-    feedback_store.append(feedback.dict())
-    
+    total = await feedback_store.add(
+        feedback.question, feedback.solution, feedback.rating, feedback.comments
+    )
+
     if feedback.rating < 3:
         print(f"⚠️ Low rating for: {feedback.question}")
-    
-    return {"message": "Feedback received", "total_feedback": len(feedback_store)}
+
+    return {"message": "Feedback received", "total_feedback": total}
 
 @app.get("/api/feedback/stats")
 async def get_feedback_stats():
     """Get feedback statistics"""
-    if not feedback_store:
-        return {"average_rating": 0, "total_feedback": 0}
-    
-    avg_rating = sum(f['rating'] for f in feedback_store) / len(feedback_store)
-    return {
-        "average_rating": round(avg_rating, 2),
-        "total_feedback": len(feedback_store),
-        "feedback_breakdown": {
-            "5_star": len([f for f in feedback_store if f['rating'] == 5]),
-            "4_star": len([f for f in feedback_store if f['rating'] == 4]),
-            "3_star": len([f for f in feedback_store if f['rating'] == 3]),
-            "2_star": len([f for f in feedback_store if f['rating'] == 2]),
-            "1_star": len([f for f in feedback_store if f['rating'] == 1]),
-        }
-    }
+    return await feedback_store.stats()
 
 @app.get("/api/health")
 async def health_check():
@@ -104,9 +123,9 @@ async def health_check():
     return {
         "status": "healthy",
         "agent": "ready",
-        "knowledge_base_size": kb_manager.collection.count(),
-        "groq_configured": bool(os.getenv("GROQ_API_KEY")),
-        "tavily_configured": bool(os.getenv("TAVILY_API_KEY"))
+        "knowledge_base_size": kb_manager.count(),
+        "groq_configured": bool(groq_key()),
+        "tavily_configured": bool(tavily_key())
     }
 
 @app.get("/")
@@ -117,6 +136,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "solve": "/api/solve",
+            "solve_stream": "/api/solve/stream",
             "feedback": "/api/feedback",
             "stats": "/api/feedback/stats",
             "health": "/api/health"
@@ -124,4 +144,13 @@ async def root():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
\ No newline at end of file
+    # uvicorn needs the import string (not the app object) to fork workers
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=False,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+    )
\ No newline at end of file
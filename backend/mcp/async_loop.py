@@ -0,0 +1,33 @@
+import asyncio
+import threading
+
+class AsyncLoopThread:
+    """A persistent event loop running on a daemon thread.
+
+    Tool calls submitted here run off the main (FastAPI) event loop, so a
+    slow MCP round-trip never blocks request handling, while callers on
+    any loop can still await the result.
+    """
+
+    def __init__(self, name: str = "mcp-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop thread; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro):
+        """Await a coroutine executed on the loop thread from any other loop"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro):
+        """Run a coroutine on the loop thread and block for the result"""
+        return self.submit(coro).result()
@@ -1,57 +1,98 @@
-from .mcp_protocol import MCPClient
-from .math_server_search import MathSearchMCPServer
-from typing import Dict, Any
-
-class MathSearchMCPClient:
-    """Client for Math Search MCP Server"""
-    
-    def __init__(self):
-        # Create server instance
-        self.server = MathSearchMCPServer()
-        
-        # Create client connected to server
-        self.client = MCPClient(self.server)
-        
-        # Connect
-        self.client.connect()
-        
-        # List available tools
-        tools = self.client.list_tools()
-        print(f"📋 MCP Tools available: {[t.name for t in tools]}")
-    
-    def search_math_solution(self, query: str, search_depth: str = "basic") -> Dict[str, Any]:
-        """Search for math solutions via MCP"""
-        result = self.client.call_tool(
-            "search_math_solution",
-            {
-                "query": query,
-                "search_depth": search_depth
-            }
-        )
-        
-        if result.success:
-            return result.content
-        else:
-            return {
-                "error": result.content,
-                "found": False,
-                "results": []
-            }
-    
-    def search_math_concept(self, concept: str) -> Dict[str, Any]:
-        """Search for concept explanations via MCP"""
-        result = self.client.call_tool(
-            "search_math_concept",
-            {
-                "concept": concept
-            }
-        )
-        
-        if result.success:
-            return result.content
-        else:
-            return {
-                "error": result.content,
-                "found": False,
-                "results": []
-            }
\ No newline at end of file
+from .async_loop import AsyncLoopThread
+from .mcp_protocol import MCPClient
+from .math_server_search import MathSearchMCPServer
+from typing import Dict, Any
+
+# One loop thread shared by all MCP clients in the process
+_loop_thread = AsyncLoopThread()
+
+class MathSearchMCPClient:
+    """Client for Math Search MCP Server"""
+
+    def __init__(self):
+        # Create server instance
+        self.server = MathSearchMCPServer()
+
+        # Create client connected to server
+        self.client = MCPClient(self.server)
+
+        # Connect
+        self.client.connect()
+
+        # List available tools
+        tools = self.client.list_tools()
+        print(f"📋 MCP Tools available: {[t.name for t in tools]}")
+
+    async def _call_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        return await self.client.call_tool(tool_name, arguments)
+
+    async def acall_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        """Call a tool on the persistent MCP loop thread
+
+        Awaitable from any event loop, and gather-friendly: several tool
+        calls can be scheduled at once without blocking the caller's loop.
+        """
+        return await _loop_thread.run(self._call_tool(tool_name, arguments))
+
+    async def asearch_math_solution(self, query: str, search_depth: str = "basic") -> Dict[str, Any]:
+        """Async search for math solutions via MCP"""
+        result = await self.acall_tool(
+            "search_math_solution",
+            {
+                "query": query,
+                "search_depth": search_depth
+            }
+        )
+
+        if result.success:
+            return result.content
+        else:
+            return {
+                "error": result.content,
+                "found": False,
+                "results": []
+            }
+
+    async def asearch_math_concept(self, concept: str) -> Dict[str, Any]:
+        """Async search for concept explanations via MCP"""
+        result = await self.acall_tool(
+            "search_math_concept",
+            {
+                "concept": concept
+            }
+        )
+
+        if result.success:
+            return result.content
+        else:
+            return {
+                "error": result.content,
+                "found": False,
+                "results": []
+            }
+
+    async def asearch_math_concepts(self, concepts: list) -> Dict[str, Any]:
+        """Async batch search for several concept explanations via MCP"""
+        result = await self.acall_tool(
+            "search_math_concepts_batch",
+            {
+                "concepts": concepts
+            }
+        )
+
+        if result.success:
+            return result.content
+        else:
+            return {
+                "error": result.content,
+                "found": False,
+                "results": []
+            }
+
+    def search_math_solution(self, query: str, search_depth: str = "basic") -> Dict[str, Any]:
+        """Search for math solutions via MCP (sync wrapper)"""
+        return _loop_thread.run_sync(self.asearch_math_solution(query, search_depth))
+
+    def search_math_concept(self, concept: str) -> Dict[str, Any]:
+        """Search for concept explanations via MCP (sync wrapper)"""
+        return _loop_thread.run_sync(self.asearch_math_concept(concept))
@@ -1,17 +1,111 @@
 from .mcp_protocol import MCPServer, MCPTool, MCPToolResult
-from tavily import TavilyClient
-import os
+from collections import OrderedDict
+from config import tavily_key
+from types import MappingProxyType
 from typing import Dict, Any
+import asyncio
+import atexit
+import httpx
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+def _is_transient(exc: BaseException) -> bool:
+    """Retry only failures that can succeed on a second attempt"""
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+# Hoisted so the per-call search payloads don't rebuild these lists;
+# tuples serialize to JSON arrays as-is
+_SOLUTION_DOMAINS = (
+    "khanacademy.org",
+    "mathway.com",
+    "symbolab.com",
+    "math.stackexchange.com",
+    "brilliant.org",
+    "wolframalpha.com"
+)
+
+_CONCEPT_DOMAINS = (
+    "khanacademy.org",
+    "math.stackexchange.com",
+    "brilliant.org",
+    "mathworld.wolfram.com",
+    "wikipedia.org"
+)
+
+# Tool schemas defined once at module scope and wrapped read-only: every
+# worker shares the same objects after fork (copy-on-write), and nothing
+# can mutate a schema out from under its compiled validator. Only the
+# top level is proxied - fastjsonschema requires plain dicts inside.
+_SEARCH_SOLUTION_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "The mathematical question or problem to search for"
+        },
+        "search_depth": {
+            "type": "string",
+            "enum": ["basic", "advanced"],
+            "description": "How thorough the search should be",
+            "default": "basic"
+        }
+    },
+    "required": ["query"]
+})
+
+_SEARCH_CONCEPT_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "concept": {
+            "type": "string",
+            "description": "The mathematical concept to explain"
+        }
+    },
+    "required": ["concept"]
+})
+
+_SEARCH_CONCEPTS_BATCH_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "concepts": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "The mathematical concepts to explain"
+        }
+    },
+    "required": ["concepts"]
+})
 
 class MathSearchMCPServer(MCPServer):
     """MCP Server providing math search capabilities"""
-    
+
+    # LRU bound for memoized Tavily responses
+    SEARCH_CACHE_MAX = 512
+
+    # Cap on in-flight Tavily requests when callers fan out with gather
+    MAX_CONCURRENT_SEARCHES = 10
+
     def __init__(self):
         super().__init__("math-search-server")
-        
-        # Initialize Tavily
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        self.tavily_client = TavilyClient(api_key=tavily_key) if tavily_key else None
+
+        # Initialize Tavily - calls go straight to the REST API over a
+        # shared async client kept alive for the process lifetime, so
+        # concurrent searches multiplex one TCP/TLS connection over
+        # HTTP/2 instead of paying a handshake per call
+        self._tavily_key = tavily_key()
+        self._http = httpx.AsyncClient(
+            http2=True, timeout=15.0, base_url="https://api.tavily.com"
+        )
+        self._search_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SEARCHES)
+        atexit.register(self._close_http)
+
+        # Memoized search responses - kept on the instance so the cache
+        # doesn't pin self the way functools.lru_cache on a method would
+        self._search_cache = OrderedDict()
         
         # Register tools
         self._register_tools()
@@ -23,62 +117,115 @@ class MathSearchMCPServer(MCPServer):
         search_solution_tool = MCPTool(
             name="search_math_solution",
             description="Search the web for mathematical solutions, explanations, and step-by-step guides",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The mathematical question or problem to search for"
-                    },
-                    "search_depth": {
-                        "type": "string",
-                        "enum": ["basic", "advanced"],
-                        "description": "How thorough the search should be",
-                        "default": "basic"
-                    }
-                },
-                "required": ["query"]
-            }
+            parameters=_SEARCH_SOLUTION_SCHEMA
         )
-        self.register_tool(search_solution_tool)
-        
+        self.register_tool(search_solution_tool, self._search_math_solution)
+
         # Tool 2: Search Math Concept
         search_concept_tool = MCPTool(
             name="search_math_concept",
             description="Search for explanations of mathematical concepts, theorems, and definitions",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "concept": {
-                        "type": "string",
-                        "description": "The mathematical concept to explain"
-                    }
-                },
-                "required": ["concept"]
-            }
+            parameters=_SEARCH_CONCEPT_SCHEMA
         )
-        self.register_tool(search_concept_tool)
-    
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> MCPToolResult:
-        """Execute a tool call"""
-        
-        if tool_name == "search_math_solution":
-            return self._search_math_solution(arguments)
-        elif tool_name == "search_math_concept":
-            return self._search_math_concept(arguments)
-        else:
+        self.register_tool(search_concept_tool, self._search_math_concept)
+
+        # Tool 3: Batch Concept Search
+        search_concepts_batch_tool = MCPTool(
+            name="search_math_concepts_batch",
+            description="Search for explanations of several mathematical concepts in one call",
+            parameters=_SEARCH_CONCEPTS_BATCH_SCHEMA
+        )
+        self.register_tool(search_concepts_batch_tool, self._search_math_concepts_batch)
+
+    def _close_http(self):
+        """Close the pooled HTTP connection at interpreter shutdown"""
+        try:
+            asyncio.run(self._http.aclose())
+        except Exception:
+            pass
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Collapse case and whitespace so trivially different spellings share a cache slot"""
+        return " ".join(query.lower().split())
+
+    async def _cached_search(self, key, search_fn):
+        """LRU memoizer for Tavily calls - repeat queries skip the network"""
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            self._search_cache.move_to_end(key)
+            return cached
+
+        results = await search_fn()
+
+        if len(self._search_cache) >= self.SEARCH_CACHE_MAX:
+            self._search_cache.popitem(last=False)
+        self._search_cache[key] = results
+        return results
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential_jitter(initial=0.25, max=2.0),
+        retry=retry_if_exception(_is_transient),
+        reraise=True,
+    )
+    async def _tavily_search(self, query: str, search_depth: str,
+                             max_results: int, include_domains: tuple) -> Dict[str, Any]:
+        """POST to Tavily's search endpoint on the shared async client
+
+        Transient failures (timeouts, 429, 5xx) are retried in-process
+        with jittered backoff - far cheaper than surfacing the error and
+        letting the agent burn an LLM turn re-asking. Other 4xx propagate
+        immediately.
+        """
+        async with self._search_semaphore:
+            response = await self._http.post("/search", json={
+                "api_key": self._tavily_key,
+                "query": query,
+                "search_depth": search_depth,
+                "max_results": max_results,
+                "include_domains": list(include_domains),
+            })
+            response.raise_for_status()
+            return response.json()
+
+    async def _fetch_solution(self, query: str, search_depth: str):
+        """Cache-miss path: build the enhanced query and hit Tavily"""
+        enhanced_query = f"how to solve {query} step by step mathematics"
+        results = await self._tavily_search(
+            query=enhanced_query,
+            search_depth=search_depth,
+            max_results=5,
+            include_domains=_SOLUTION_DOMAINS
+        )
+        return enhanced_query, results
+
+    async def _fetch_concept(self, concept: str):
+        """Cache-miss path: build the enhanced query and hit Tavily"""
+        enhanced_query = f"explain {concept} mathematics definition theorem"
+        results = await self._tavily_search(
+            query=enhanced_query,
+            search_depth="advanced",
+            max_results=3,
+            include_domains=_CONCEPT_DOMAINS
+        )
+        return enhanced_query, results
+
+    async def _search_math_solution(self, arguments: Dict[str, Any]) -> MCPToolResult:
+        """Search for math solutions"""
+        query = (arguments.get("query") or "").strip()
+        search_depth = arguments.get("search_depth", "basic")
+
+        # LLMs sometimes hallucinate empty arguments - don't burn an RTT
+        # and an API credit on them
+        if not query:
             return MCPToolResult(
                 success=False,
-                content=f"Unknown tool: {tool_name}",
-                metadata={"error": "unknown_tool"}
+                content="Empty query",
+                metadata={"error": "empty_query"}
             )
-    
-    def _search_math_solution(self, arguments: Dict[str, Any]) -> MCPToolResult:
-        """Search for math solutions"""
-        query = arguments.get("query", "")
-        search_depth = arguments.get("search_depth", "basic")
-        
-        if not self.tavily_client:
+
+        if not self._tavily_key:
             return MCPToolResult(
                 success=False,
                 content="Tavily API not configured",
@@ -89,35 +236,26 @@ class MathSearchMCPServer(MCPServer):
             )
         
         try:
-            # Enhanced query
-            enhanced_query = f"how to solve {query} step by step mathematics"
-            
-            # Perform search
-            results = self.tavily_client.search(
-                query=enhanced_query,
-                search_depth=search_depth,
-                max_results=5,
-                include_domains=[
-                    "khanacademy.org",
-                    "mathway.com",
-                    "symbolab.com",
-                    "math.stackexchange.com",
-                    "brilliant.org",
-                    "wolframalpha.com"
-                ]
+            # Memoized on the normalized query + depth; the enhanced query
+            # is only built (and cached) on a miss
+            enhanced_query, results = await self._cached_search(
+                ("solution", self._normalize_query(query), search_depth),
+                lambda: self._fetch_solution(query, search_depth)
             )
-            
+
+            hits = results.get("results") or []
+
             return MCPToolResult(
                 success=True,
                 content={
                     "query": query,
                     "enhanced_query": enhanced_query,
-                    "results": results.get("results", []),
-                    "found": len(results.get("results", [])) > 0
+                    "results": hits,
+                    "found": len(hits) > 0
                 },
                 metadata={
                     "search_depth": search_depth,
-                    "num_results": len(results.get("results", []))
+                    "num_results": len(hits)
                 }
             )
             
@@ -131,11 +269,63 @@ class MathSearchMCPServer(MCPServer):
                 }
             )
     
-    def _search_math_concept(self, arguments: Dict[str, Any]) -> MCPToolResult:
+    async def _search_math_concepts_batch(self, arguments: Dict[str, Any]) -> MCPToolResult:
+        """Fan out several concept searches concurrently
+
+        Duplicates are collapsed before dispatch so each distinct concept
+        hits Tavily (or the LRU cache) exactly once; the batch completes
+        in roughly one round-trip instead of one per concept.
+        """
+        concepts = list(dict.fromkeys(
+            concept.strip() for concept in arguments.get("concepts", [])
+            if concept and concept.strip()
+        ))
+
+        if not concepts:
+            return MCPToolResult(
+                success=False,
+                content="No concepts provided",
+                metadata={"error": "empty_batch"}
+            )
+
+        results = await asyncio.gather(
+            *(self._search_math_concept({"concept": concept}) for concept in concepts),
+            return_exceptions=True
+        )
+
+        content = {}
+        num_failed = 0
+        for concept, result in zip(concepts, results):
+            if isinstance(result, Exception):
+                content[concept] = {"error": str(result), "found": False, "results": []}
+                num_failed += 1
+            elif result.success:
+                content[concept] = result.content
+            else:
+                content[concept] = {"error": result.content, "found": False, "results": []}
+                num_failed += 1
+
+        return MCPToolResult(
+            success=num_failed < len(concepts),
+            content=content,
+            metadata={
+                "num_concepts": len(concepts),
+                "num_failed": num_failed
+            }
+        )
+
+    async def _search_math_concept(self, arguments: Dict[str, Any]) -> MCPToolResult:
         """Search for concept explanations"""
-        concept = arguments.get("concept", "")
-        
-        if not self.tavily_client:
+        concept = (arguments.get("concept") or "").strip()
+
+        if not concept:
+            return MCPToolResult(
+                success=False,
+                content="Empty concept",
+                metadata={"error": "empty_query"}
+            )
+
+        if not self._tavily_key:
             return MCPToolResult(
                 success=False,
                 content="Tavily API not configured",
@@ -146,31 +336,23 @@ class MathSearchMCPServer(MCPServer):
             )
         
         try:
-            enhanced_query = f"explain {concept} mathematics definition theorem"
-            
-            results = self.tavily_client.search(
-                query=enhanced_query,
-                search_depth="advanced",
-                max_results=3,
-                include_domains=[
-                    "khanacademy.org",
-                    "math.stackexchange.com",
-                    "brilliant.org",
-                    "mathworld.wolfram.com",
-                    "wikipedia.org"
-                ]
+            enhanced_query, results = await self._cached_search(
+                ("concept", self._normalize_query(concept)),
+                lambda: self._fetch_concept(concept)
             )
             
+            hits = results.get("results") or []
+
             return MCPToolResult(
                 success=True,
                 content={
                     "concept": concept,
                     "enhanced_query": enhanced_query,
-                    "results": results.get("results", []),
-                    "found": len(results.get("results", [])) > 0
+                    "results": hits,
+                    "found": len(hits) > 0
                 },
                 metadata={
-                    "num_results": len(results.get("results", []))
+                    "num_results": len(hits)
                 }
             )
             
@@ -1,15 +1,22 @@
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass
+import fastjsonschema
+import inspect
 import json
+import logging
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# slots=True drops the per-instance __dict__ (these are built on every
+# tool call); frozen=True because neither is mutated after construction
+@dataclass(slots=True, frozen=True)
 class MCPTool:
     """Represents an MCP tool"""
     name: str
     description: str
     parameters: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MCPToolResult:
     """Result from an MCP tool call"""
     success: bool
@@ -22,27 +29,62 @@ class MCPServer:
     def __init__(self, name: str):
         self.name = name
         self.tools: Dict[str, MCPTool] = {}
-    
-    def register_tool(self, tool: MCPTool):
-        """Register a tool with the server"""
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], MCPToolResult]] = {}
+        self._validators: Dict[str, Callable] = {}
+
+    def register_tool(self, tool: MCPTool, handler: Callable[[Dict[str, Any]], MCPToolResult] = None):
+        """Register a tool and its handler with the server
+
+        The tool's JSON-Schema parameters are compiled once here, so
+        argument validation at call time is a specialized generated
+        function rather than a generic schema walk.
+        """
         self.tools[tool.name] = tool
-        print(f"✅ MCP Tool registered: {tool.name}")
-    
+        if handler is not None:
+            self._handlers[tool.name] = handler
+        try:
+            # Compile from a plain dict: fastjsonschema embeds the schema's
+            # repr into the generated error path, and a mappingproxy repr
+            # turns validation failures into NameErrors
+            self._validators[tool.name] = fastjsonschema.compile(dict(tool.parameters))
+        except Exception:
+            logger.warning("Could not compile schema for '%s'", tool.name, exc_info=True)
+        # %s-style args defer formatting until a handler actually emits
+        logger.debug("MCP Tool registered: %s", tool.name)
+
     def list_tools(self) -> List[MCPTool]:
         """List all available tools"""
         return list(self.tools.values())
-    
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> MCPToolResult:
-        """Call a tool by name"""
-        if tool_name not in self.tools:
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> MCPToolResult:
+        """Call a tool by name via the handler jump table
+
+        Handlers may be plain functions or coroutines; async handlers let
+        callers fan out several tool calls with asyncio.gather.
+        """
+        handler = self._handlers.get(tool_name)
+        if handler is None:
             return MCPToolResult(
                 success=False,
                 content=f"Tool '{tool_name}' not found",
                 metadata={"error": "tool_not_found"}
             )
-        
-        # This should be overridden by subclasses
-        raise NotImplementedError("Subclass must implement call_tool")
+
+        validator = self._validators.get(tool_name)
+        if validator is not None:
+            try:
+                validator(arguments)
+            except fastjsonschema.JsonSchemaException as e:
+                return MCPToolResult(
+                    success=False,
+                    content=f"Invalid arguments for '{tool_name}': {e.message}",
+                    metadata={"error": "invalid_arguments"}
+                )
+
+        result = handler(arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
 class MCPClient:
     """Base MCP Client for connecting to servers"""
@@ -54,13 +96,13 @@ class MCPClient:
     def connect(self) -> bool:
         """Connect to the MCP server"""
         self.connection_id = f"conn_{id(self)}"
-        print(f"✅ MCP Client connected to server: {self.server.name}")
+        logger.debug("MCP Client connected to server: %s", self.server.name)
         return True
     
     def list_tools(self) -> List[MCPTool]:
         """List available tools from server"""
         return self.server.list_tools()
     
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> MCPToolResult:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> MCPToolResult:
         """Call a tool on the server"""
-        return self.server.call_tool(tool_name, arguments)
\ No newline at end of file
+        return await self.server.call_tool(tool_name, arguments)
\ No newline at end of file
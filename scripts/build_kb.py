@@ -0,0 +1,65 @@
+"""Precompute knowledge base embeddings offline.
+
+Reads math_dataset.json, encodes every question with the same
+SentenceTransformer the server uses, and writes kb_emb.npy plus
+kb_meta.json next to the dataset. At startup KnowledgeBaseManager
+mmaps the .npy instead of re-encoding the whole dataset, so a cold
+start no longer pays minutes of CPU encoding.
+
+Usage: python scripts/build_kb.py [path/to/math_dataset.json]
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+DEFAULT_DATASET = "backend/knowledge_base/math_dataset.json"
+
+def main():
+    data_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATASET
+
+    if not os.path.exists(data_path):
+        print(f"⚠️ Dataset not found at {data_path}")
+        sys.exit(1)
+
+    with open(data_path, 'rb') as f:
+        raw = f.read()
+    dataset_sha256 = hashlib.sha256(raw).hexdigest()
+    data = json.loads(raw)
+
+    print(f"Encoding {len(data)} questions...")
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    embeddings = model.encode(
+        [item['question'] for item in data],
+        batch_size=128,
+        normalize_embeddings=True,
+        convert_to_numpy=True
+    ).astype(np.float32)
+
+    out_dir = os.path.dirname(data_path)
+    emb_path = os.path.join(out_dir, 'kb_emb.npy')
+    meta_path = os.path.join(out_dir, 'kb_meta.json')
+
+    np.save(emb_path, embeddings)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'dataset_sha256': dataset_sha256,
+            'entries': [
+                {
+                    'question': item['question'],
+                    'solution': item['solution'],
+                    'steps': item['steps'],
+                    'topic': item['topic'],
+                    'difficulty': item['difficulty']
+                }
+                for item in data
+            ]
+        }, f, indent=2)
+
+    print(f"✅ Wrote {emb_path} ({embeddings.shape[0]}×{embeddings.shape[1]}) and {meta_path}")
+
+if __name__ == "__main__":
+    main()